@@ -0,0 +1,331 @@
+# Benchmarks for the runner's hot paths, on synthetic data generated into a temp folder.
+#
+#   python benchmarks/bench.py [--quick] [--output report.json] [--baseline old.json]
+#
+# Generates a repository tree with thousands of small workbooks, one large workbook with
+# multiline cells, and a stub "newman" (benchmarks/fake_newman.py) on PATH, then times:
+# excel_to_csv, the conversion cache, the workbook index and search filtering, progress
+# parsing, startup imports and an end-to-end headless run. With --baseline, any timing
+# more than --threshold slower than the baseline is reported and the exit code is 1;
+# so is a startup (import to first idle) over startup_budget_ms, and a CSV from
+# excel_to_csv that differs from what the old pandas converter wrote.
+import csv
+import datetime
+import importlib.util
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+import pipeline
+
+def timed(results, name, func, repeat=1):
+    # Best of `repeat` runs, in seconds
+    best = None
+    value = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    results[name] = round(best, 6)
+    print(f"{name:<40} {best * 1000:>12.2f} ms", flush=True)
+    return value
+
+def write_workbook(path, rows, columns=8, multiline=False):
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Data")
+    sheet.append([f"col{column}" for column in range(columns)])
+    for row in range(rows):
+        values = [f"value {row}-{column}" for column in range(columns)]
+        if multiline:
+            values[1] = f"line one {row}\nline two\nline three"
+        values[0] = row
+        sheet.append(values)
+    workbook.save(path)
+
+def make_repository(repo_path, files, depth):
+    # Deep trees with a few workbooks per directory, plus a pruned node_modules
+    template = os.path.join(repo_path, "_template.xlsx")
+    os.makedirs(repo_path, exist_ok=True)
+    write_workbook(template, rows=5)
+    for index in range(files):
+        parts = [f"level{level}_{(index >> level) % 4}" for level in range(depth)]
+        folder = os.path.join(repo_path, *parts)
+        os.makedirs(folder, exist_ok=True)
+        shutil.copyfile(template, os.path.join(folder, f"suite_{index}_payment_flow.xlsx"))
+    os.makedirs(os.path.join(repo_path, "node_modules", "pkg"), exist_ok=True)
+    os.remove(template)
+
+def install_fake_newman(bin_dir):
+    os.makedirs(bin_dir, exist_ok=True)
+    script = os.path.join(BENCH_DIR, "fake_newman.py")
+    if sys.platform == "win32":
+        with open(os.path.join(bin_dir, "newman.cmd"), "w") as f:
+            f.write(f'@"{sys.executable}" "{script}" %*\n')
+    else:
+        path = os.path.join(bin_dir, "newman")
+        with open(path, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+        os.chmod(path, 0o755)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+
+def fake_output(iterations, requests=2):
+    lines = ["newman\n", "\n", "Fake Collection\n"]
+    for iteration in range(iterations):
+        lines.append(f"\nIteration {iteration + 1}/{iterations}\n")
+        for request in range(requests):
+            lines.append(f"→ Request {request + 1}\n")
+            lines.append("  POST https://example.test/api [200 OK, 1.2kB, 35ms]\n")
+            lines.append("  ✓  Status code is 200\n")
+    return lines
+
+def bench_conversion(results, work, rows):
+    big = os.path.join(work, "big.xlsx")
+    timed(results, f"generate_workbook_{rows}_rows", lambda: write_workbook(big, rows, multiline=True))
+    count = timed(results, "excel_to_csv", lambda: pipeline.excel_to_csv(big, os.path.join(work, "big.csv")))
+    assert count == rows, count
+    cache = pipeline.ConversionCache(os.path.join(work, "csv_cache"), 10 * 1024 ** 3)
+    timed(results, "conversion_cache_miss", lambda: cache.get_csv(big))
+    timed(results, "conversion_cache_hit", lambda: cache.get_csv(big), repeat=5)
+
+def old_excel_to_csv(excel_file, csv_file):
+    # The converter excel_to_csv replaced, kept here to compare against
+    import pandas as pd
+    df = pd.read_excel(excel_file, sheet_name=0, engine=None)
+    for column in df.columns:
+        for index, value in df[column].items():
+            if isinstance(value, str) and '\n' in value:
+                df.at[index, column] = value.replace('\n', '|')
+    df.to_csv(csv_file, index=False)
+
+def check_conversion(work):
+    # Returns a failure message when excel_to_csv writes something the pandas converter
+    # did not, on a sheet with dates, numbers, blank and duplicate headers and blank rows
+    if importlib.util.find_spec("pandas") is None:
+        print("check_conversion skipped: pandas is not installed")
+        return None
+    from openpyxl import Workbook
+    path = os.path.join(work, "mixed.xlsx")
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["id", "name", None, "due", "at", "amount", "name", None, 2024])
+    sheet.append([1, "alice\nsmith", "x", datetime.datetime(2024, 1, 5), datetime.datetime(2024, 1, 5, 10, 30), 12.5, "a", None, True])
+    sheet.append([2, "bob", None, datetime.datetime(2024, 2, 29), datetime.datetime(2024, 2, 29, 23, 59, 59), 7, "b", None, False])
+    sheet.append([])
+    sheet.append([3, None, "z", None, None, 0.1, "c", None, None, "beyond the header"])
+    sheet.append([4, "dave", None, datetime.datetime(2023, 12, 31), datetime.datetime(2023, 12, 31, 0, 0, 1), -3, "d", None, None])
+    sheet.append([])
+    workbook.save(path)
+
+    old_csv = os.path.join(work, "mixed-pandas.csv")
+    new_csv = os.path.join(work, "mixed.csv")
+    old_excel_to_csv(path, old_csv)
+    pipeline.excel_to_csv(path, new_csv)
+    with open(old_csv, newline='', encoding='utf-8') as f:
+        old_rows = list(csv.reader(f))
+    with open(new_csv, newline='', encoding='utf-8') as f:
+        new_rows = list(csv.reader(f))
+    differences = []
+    if len(old_rows) != len(new_rows):
+        differences.append(f"{len(new_rows)} lines instead of {len(old_rows)}")
+    for line, (old_row, new_row) in enumerate(zip(old_rows, new_rows), 1):
+        if len(old_row) != len(new_row):
+            differences.append(f"line {line}: {new_row} instead of {old_row}")
+            continue
+        for old, new in zip(old_row, new_row):
+            # pandas turned integer and boolean columns with blanks into floats (42.0, 1.0);
+            # 42 and True are the values that were in the workbook
+            upcast = {"True": "1.0", "False": "0.0"}.get(new, new + ".0")
+            if old != new and old != upcast:
+                differences.append(f"line {line}: {new!r} instead of {old!r}")
+    print(f"{'check_conversion':<40} {'ok' if not differences else 'DIFFERENT'}", flush=True)
+    if differences:
+        return "excel_to_csv differs from the pandas converter: " + "; ".join(differences)
+    return None
+
+def bench_index_and_search(results, work, files, depth):
+    repo_path = os.path.join(work, "repositories", "synthetic")
+    timed(results, f"generate_repository_{files}_files", lambda: make_repository(repo_path, files, depth))
+    index_path = os.path.join(work, "cache", "workbooks-synthetic.json")
+    index = pipeline.WorkbookIndex(repo_path, index_path)
+    names = timed(results, "workbook_index_cold", index.refresh)
+    assert len(names) == files, len(names)
+    timed(results, "workbook_index_warm", index.refresh, repeat=5)
+    timed(results, "workbook_index_reload", lambda: pipeline.WorkbookIndex(repo_path, index_path).refresh(), repeat=3)
+
+    # SearchIndex sits next to the Tk widgets; importing Tk needs no display
+    from runner import SearchIndex
+    search = timed(results, "search_index_build", lambda: SearchIndex(names))
+    for query in ("s", "pay", "suite_1234", "paymnet_flow"):
+        timed(results, f"search_{query}", lambda: search.search(query), repeat=5)
+
+def bench_progress(results, iterations):
+    lines = fake_output(iterations)
+
+    def parse():
+        counter = pipeline.IterationCounter()
+        for line in lines:
+            counter.feed(line)
+        assert counter.current == iterations
+    timed(results, f"progress_parse_{iterations}_iterations", parse, repeat=3)
+
+# Milliseconds from importing runner to the main window's first idle. Without a display
+# only the import can be measured. Runs in the work folder so the UI's history and
+# metrics files end up there.
+STARTUP_PROBE = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+started = time.perf_counter()
+import runner
+try:
+    root = runner.tk.Tk()
+except runner.tk.TclError:
+    root = None
+if root is not None:
+    runner.AutomationUI(root)
+    root.update()
+    root.destroy()
+print((time.perf_counter() - started) * 1000, root is not None)
+"""
+
+def bench_startup(results, work):
+    # Returns a failure message when startup is over its budget (startup_budget_ms)
+    def import_runner():
+        subprocess.check_call([sys.executable, "-c", "import runner"], cwd=ROOT_DIR)
+    timed(results, "startup_import_runner", import_runner, repeat=3)
+    results["startup_budget"] = pipeline.STARTUP_BUDGET_MS / 1000
+
+    best = None
+    for _ in range(3):
+        output = subprocess.check_output([sys.executable, "-c", STARTUP_PROBE, ROOT_DIR], cwd=work, text=True)
+        elapsed_ms, first_idle = output.split()[-2:]
+        best = float(elapsed_ms) if best is None else min(best, float(elapsed_ms))
+    name = "startup_first_idle" if first_idle == "True" else "startup_import_only"
+    results[name] = round(best / 1000, 6)
+    print(f"{name:<40} {best:>12.2f} ms (budget {pipeline.STARTUP_BUDGET_MS} ms)", flush=True)
+    if best > pipeline.STARTUP_BUDGET_MS:
+        return f"startup took {best:.0f} ms, over its {pipeline.STARTUP_BUDGET_MS} ms budget"
+    return None
+
+def bench_end_to_end(results, work, rows, shards):
+    # The headless CLI in an isolated workspace, so reports and logs stay in the temp folder
+    workspace = os.path.join(work, "workspace")
+    repo_path = os.path.join(workspace, "repositories", "e2e")
+    os.makedirs(repo_path, exist_ok=True)
+    shutil.copy(os.path.join(ROOT_DIR, "pipeline.py"), workspace)
+    shutil.copy(os.path.join(ROOT_DIR, "config.ini"), workspace)
+    for suffix in (".postman_collection.json", ".postman_environment.json"):
+        with open(os.path.join(workspace, "bench" + suffix), "w") as f:
+            f.write("{}")
+    write_workbook(os.path.join(repo_path, "e2e.xlsx"), rows, multiline=True)
+
+    def run(parallel):
+        output = subprocess.check_output(
+            [sys.executable, "pipeline.py", "run", "--repo", "e2e", "--workbook", "e2e.xlsx",
+             "--parallel", str(parallel), "--json"],
+            cwd=workspace, stderr=subprocess.DEVNULL
+        )
+        job = json.loads(output)["jobs"][0]
+        assert job["status"] == "passed", job
+    timed(results, f"end_to_end_{rows}_rows", lambda: run(1))
+    timed(results, f"end_to_end_{rows}_rows_{shards}_shards", lambda: run(shards))
+
+def compare(results, baseline, threshold, min_delta):
+    # Sub-millisecond timings are noisy, so a slowdown also has to exceed min_delta seconds
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        before = baseline.get(name)
+        if not before or name.startswith(("generate_", "startup_budget")):
+            continue
+        change = (seconds - before) / before
+        marker = ""
+        if change > threshold and seconds - before > min_delta:
+            marker = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<40} {before * 1000:>10.2f} -> {seconds * 1000:>10.2f} ms ({change:+.0%}){marker}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the runner on synthetic data.")
+    parser.add_argument("--quick", action="store_true", help="small data sizes for a smoke run")
+    parser.add_argument("--rows", type=int, default=None, help="rows in the large workbook (default 100000)")
+    parser.add_argument("--files", type=int, default=None, help="workbooks in the synthetic repository (default 5000)")
+    parser.add_argument("--depth", type=int, default=6, help="directory depth of the synthetic repository")
+    parser.add_argument("--shards", type=int, default=4, help="shards for the parallel end-to-end run")
+    parser.add_argument("--output", default=None, help="write the timings to this JSON file")
+    parser.add_argument("--baseline", default=None, help="JSON file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown that counts as a regression (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5, help="ignore slowdowns smaller than this")
+    parser.add_argument("--keep", action="store_true", help="keep the generated data")
+    args = parser.parse_args(argv)
+    rows = args.rows or (2000 if args.quick else 100000)
+    files = args.files or (300 if args.quick else 5000)
+    e2e_rows = 200 if args.quick else 2000
+
+    work = tempfile.mkdtemp(prefix="runner-bench-")
+    install_fake_newman(os.path.join(work, "bin"))
+    # Stage timings and run history of the benchmarked code go to the work folder, not to
+    # the files of the folder the benchmark was started from
+    cwd = os.getcwd()
+    os.chdir(work)
+    pipeline.METRICS_FILE = os.path.join(work, "log", "metrics.jsonl")
+    pipeline.PROMETHEUS_FILE = ""
+    pipeline.run_history = pipeline.RunHistory(os.path.join(work, "log", "history.sqlite3"))
+    results = {}
+    failures = []
+    try:
+        conversion_failure = check_conversion(work)
+        if conversion_failure:
+            failures.append(conversion_failure)
+        bench_conversion(results, work, rows)
+        bench_index_and_search(results, work, files, args.depth)
+        bench_progress(results, rows)
+        startup_failure = bench_startup(results, work)
+        if startup_failure:
+            failures.append(startup_failure)
+        bench_end_to_end(results, work, e2e_rows, args.shards)
+    finally:
+        os.chdir(cwd)
+        if args.keep:
+            print(f"Generated data kept in {work}")
+        else:
+            shutil.rmtree(work, ignore_errors=True)
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "sizes": {"rows": rows, "files": files, "depth": args.depth, "e2e_rows": e2e_rows},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("sizes") != report["sizes"]:
+            print("Warning: baseline was measured with different data sizes")
+        regressions = compare(results, baseline.get("results", {}), args.threshold, args.min_delta_ms / 1000)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            failures.append("regressions")
+    for failure in failures:
+        if failure != "regressions":
+            print(f"FAILED: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
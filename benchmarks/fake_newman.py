@@ -0,0 +1,92 @@
+# Stand-in for "newman run" used by the benchmarks. It reads the iteration CSV and prints
+# the same cli reporter lines newman does ("Iteration n/total", request and assertion
+# lines), then writes the htmlextra and json exports it was asked for.
+#
+# Tunables (environment):
+#   FAKE_NEWMAN_DELAY_MS   sleep per iteration, default 0
+#   FAKE_NEWMAN_FAIL_RATE  fraction of iterations whose assertion fails, default 0
+#   FAKE_NEWMAN_REQUESTS   requests per iteration, default 2
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+def option(args, name):
+    for index, arg in enumerate(args):
+        if arg.startswith(name + "="):
+            return arg.split("=", 1)[1]
+        if arg == name and index + 1 < len(args):
+            return args[index + 1]
+    return None
+
+def main(args):
+    data_path = option(args, "--iteration-data")
+    delay = float(os.environ.get("FAKE_NEWMAN_DELAY_MS", "0")) / 1000
+    fail_rate = float(os.environ.get("FAKE_NEWMAN_FAIL_RATE", "0"))
+    requests = int(os.environ.get("FAKE_NEWMAN_REQUESTS", "2"))
+    rng = random.Random(data_path)
+
+    with open(data_path, newline="", encoding="utf-8") as data_file:
+        rows = list(csv.DictReader(data_file))
+    total = len(rows) or 1
+    started = int(time.time() * 1000)
+    executions = []
+    failures = []
+    print("newman\n\nFake Collection\n")
+    for iteration in range(total):
+        print(f"\nIteration {iteration + 1}/{total}\n")
+        for request in range(requests):
+            name = f"Request {request + 1}"
+            response_time = rng.randint(5, 400)
+            response_size = rng.randint(200, 5000)
+            failed = rng.random() < fail_rate
+            print(f"→ {name}")
+            print(f"  POST https://example.test/api/{request + 1} [200 OK, {response_size}B, {response_time}ms]")
+            print(f"  {'1.' if failed else '✓'}  Status code is 200")
+            assertion = {"assertion": "Status code is 200"}
+            if failed:
+                error = {"name": "AssertionError", "message": "expected 500 to equal 200", "test": "Status code is 200"}
+                assertion["error"] = error
+                failures.append({"error": error, "source": {"name": name}, "cursor": {"iteration": iteration, "position": request}})
+            executions.append({
+                "cursor": {"iteration": iteration, "position": request},
+                "item": {"name": name},
+                "response": {"code": 200, "responseTime": response_time, "responseSize": response_size},
+                "assertions": [assertion],
+            })
+        sys.stdout.flush()
+        if delay:
+            time.sleep(delay)
+
+    request_total = total * requests
+    run = {
+        "stats": {
+            "iterations": {"total": total, "pending": 0, "failed": 0},
+            "requests": {"total": request_total, "pending": 0, "failed": 0},
+            "assertions": {"total": request_total, "pending": 0, "failed": len(failures)},
+        },
+        "timings": {
+            "started": started,
+            "completed": int(time.time() * 1000),
+            "responseAverage": sum(e["response"]["responseTime"] for e in executions) / max(1, len(executions)),
+        },
+        "executions": executions,
+        "failures": failures,
+    }
+    html_path = option(args, "--reporter-htmlextra-export")
+    if html_path:
+        with open(html_path, "w", encoding="utf-8") as html_file:
+            html_file.write(f"<html><body>{total} iterations, {len(failures)} failures</body></html>")
+    json_path = option(args, "--reporter-json-export")
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as json_file:
+            json.dump({"run": run}, json_file)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    # newman writes UTF-8 arrows and check marks; the runner decodes the pipe as UTF-8
+    sys.stdout.reconfigure(encoding="utf-8")
+    # First argument is the "run" subcommand
+    sys.exit(main(sys.argv[2:]))